@@ -2,77 +2,396 @@
 import argparse
 import gzip
 import io
+import json
+import multiprocessing
+import os
+import subprocess
 import sys
 import re
 import time
+import shutil
 import tarfile
 import hashlib
+import queue
+import threading
 from pathlib import Path
-from urllib.request import urlopen
-from concurrent.futures import ThreadPoolExecutor, as_completed
-from typing import Optional, Set, Dict, Tuple
+from http.client import HTTPConnection, HTTPException, HTTPSConnection
+from urllib.error import HTTPError
+from urllib.parse import urljoin, urlsplit
+from urllib.request import Request, getproxies, urlopen
+from contextlib import nullcontext
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from typing import Optional, Set, Dict, List, Tuple
+
+# ISA-L's gzip is a drop-in, much faster decoder; fall back to the stdlib
+try:
+    from isal import igzip as _gz
+except ImportError:
+    _gz = gzip
 
 DEFAULT_URL = "https://osf.io/download/4yv85/"
 
 def is_gzip(data: bytes) -> bool:
     return data[:2] == b"\x1f\x8b"
 
+def open_text_out(path: Path):
+    # fast compression level: broad queries can keep hundreds of thousands of
+    # rows, and compressing them should not hold up the scan
+    return _gz.open(path, "wt", compresslevel=1) if path.suffix == ".gz" else open(path, "w")
+
+# filter results larger than this aren't cached, so broad queries don't
+# fill the user's home directory
+FILTER_CACHE_MAX_ROWS = 100_000
+
+def filter_cache_path(data: bytes, species: str) -> Path:
+    # keyed by the metadata content and the pattern, so it never goes stale
+    cache_dir = Path(os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache") / "atb-fetch"
+    key = f"{hashlib.md5(data).hexdigest()}-{hashlib.md5(species.encode()).hexdigest()}"
+    return cache_dir / f"filter-v3-{key}.tsv.gz"
+
+def read_filter_cache(path: Path) -> Optional[Tuple[str, List[str]]]:
+    # a gzipped TSV: header, then the matching rows
+    try:
+        with _gz.open(path, "rt", encoding="utf-8") as f:
+            lines = f.read().split("\n")
+    except Exception:
+        return None
+    # anything but a header, rows and a final newline is a damaged entry
+    if len(lines) < 2 or not lines[0] or lines[-1] != "":
+        return None
+    return lines[0], lines[1:-1]
+
+def write_filter_cache(path: Path, header: str, kept: List[str]) -> None:
+    if len(kept) > FILTER_CACHE_MAX_ROWS:
+        return
+    # best effort: an unwritable cache dir only means no reuse next run
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(path.name + ".part")
+        with _gz.open(tmp, "wt", compresslevel=1, encoding="utf-8") as f:
+            f.write(header + "\n")
+            f.writelines(line + "\n" for line in kept)
+        tmp.replace(path)
+    except OSError:
+        pass
+
+def _md5_sidecar(path: Path) -> Path:
+    return path.with_suffix(path.suffix + ".md5")
+
+def write_md5_sidecar(path: Path, digest: str) -> None:
+    # md5sum-compatible line, plus the stat it was computed against
+    st = path.stat()
+    sidecar = _md5_sidecar(path)
+    tmp = sidecar.with_suffix(sidecar.suffix + ".part")
+    tmp.write_text(f"{digest}  {path.name}\n# {st.st_size} {st.st_mtime_ns}\n")
+    tmp.replace(sidecar)
+
+def read_md5_sidecar(path: Path) -> Optional[str]:
+    try:
+        lines = _md5_sidecar(path).read_text().splitlines()
+        digest = lines[0].split()[0]
+        size, mtime_ns = (int(x) for x in lines[1].lstrip("# ").split())
+    except (OSError, IndexError, ValueError):
+        return None
+    st = path.stat()
+    if st.st_size != size or st.st_mtime_ns != mtime_ns:
+        return None
+    return digest
+
+def file_md5(path: Path, chunk_size: int = 4 * 1024 * 1024) -> str:
+    # read on a helper thread so the next chunk is fetched while this one
+    # hashes (hashlib releases the GIL on large updates)
+    h = hashlib.md5()
+    chunks: "queue.Queue[object]" = queue.Queue(maxsize=4)
+    stop = threading.Event()
+
+    def put(item: object) -> bool:
+        # give up if the consumer has stopped, rather than block forever
+        while not stop.is_set():
+            try:
+                chunks.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                pass
+        return False
+
+    def reader(f) -> None:
+        read = f.read
+        try:
+            while chunk := read(chunk_size):
+                if not put(chunk):
+                    return
+        except BaseException as e:
+            put(e)
+            return
+        put(b"")
+
+    with open(path, "rb") as f:
+        t = threading.Thread(target=reader, args=(f,), daemon=True)
+        t.start()
+        get, update = chunks.get, h.update
+        try:
+            while True:
+                chunk = get()
+                if isinstance(chunk, BaseException):
+                    raise chunk
+                if not chunk:
+                    break
+                update(chunk)
+        finally:
+            stop.set()
+            t.join()
+    return h.hexdigest()
+
 def md5_ok(path: Path, expected: Optional[str]) -> bool:
     if not expected or not path.exists():
         return False
-    h = hashlib.md5()
-    with open(path, "rb") as f:
-        for chunk in iter(lambda: f.read(1024 * 1024), b""):
-            h.update(chunk)
-    return h.hexdigest() == expected.lower()
+    digest = read_md5_sidecar(path)
+    if digest is None:
+        digest = file_md5(path)
+        write_md5_sidecar(path, digest)
+    return digest == expected.lower()
+
+# keep-alive connections, cached per worker thread and per host, so each
+# worker pays the TCP/TLS handshake once rather than once per tarball
+_http = threading.local()
+
+def _close_connections() -> None:
+    for conn in getattr(_http, "conns", {}).values():
+        conn.close()
+    _http.conns = {}
+
+def http_open(url: str, method: str = "GET", timeout: float = 120, max_redirects: int = 5):
+    # plain urllib handles proxy settings; only reuse connections without one
+    if getproxies():
+        return urlopen(Request(url, method=method), timeout=timeout)
+    conns = getattr(_http, "conns", None)
+    if conns is None:
+        conns = _http.conns = {}
+    for _ in range(max_redirects + 1):
+        parts = urlsplit(url)
+        if parts.scheme not in ("http", "https"):
+            # file://, ftp:// and friends (also as redirect targets) are
+            # left to urllib, as before connection reuse
+            return urlopen(Request(url, method=method), timeout=timeout)
+        key = (parts.scheme, parts.netloc)
+        path = (parts.path or "/") + (f"?{parts.query}" if parts.query else "")
+        for fresh in (False, True):
+            conn = conns.get(key)
+            reused = conn is not None and not fresh
+            if not reused:
+                if conn is not None:
+                    conn.close()
+                cls = HTTPSConnection if parts.scheme == "https" else HTTPConnection
+                conn = conns[key] = cls(parts.netloc, timeout=timeout)
+            try:
+                conn.request(method, path, headers={"User-Agent": "atb-fetch", "Accept-Encoding": "identity"})
+                r = conn.getresponse()
+                break
+            except (HTTPException, OSError):
+                # the server may have dropped an idle connection; retry once fresh
+                if not reused:
+                    conn.close()
+                    del conns[key]
+                    raise
+        if r.status in (301, 302, 303, 307, 308) and r.getheader("Location"):
+            r.read()
+            url = urljoin(url, r.getheader("Location"))
+            # same policy as urllib: never let a server redirect to file:// etc.
+            if urlsplit(url).scheme not in ("http", "https", "ftp"):
+                raise HTTPError(url, r.status, f"redirection to url {url!r} is not allowed", r.headers, None)
+            continue
+        if r.status >= 400:
+            r.read()
+            raise HTTPError(url, r.status, r.reason, r.headers, None)
+        return r
+    raise HTTPError(url, r.status, "too many redirects", r.headers, None)
+
+def _meta_sidecar(path: Path) -> Path:
+    return path.with_suffix(path.suffix + ".meta.json")
+
+def write_meta_sidecar(path: Path, headers) -> None:
+    meta = {
+        "size": path.stat().st_size,
+        "etag": headers.get("ETag"),
+        "last_modified": headers.get("Last-Modified"),
+    }
+    sidecar = _meta_sidecar(path)
+    tmp = sidecar.with_suffix(sidecar.suffix + ".part")
+    tmp.write_text(json.dumps(meta) + "\n")
+    tmp.replace(sidecar)
+
+def head_unchanged(url: str, path: Path, net_sem: Optional[threading.Semaphore] = None) -> bool:
+    # without an upstream MD5, trust a cached tarball if the server still
+    # reports the same size and ETag/Last-Modified as when we fetched it
+    try:
+        meta = json.loads(_meta_sidecar(path).read_text())
+        size = path.stat().st_size
+    except (OSError, ValueError):
+        return False
+    if size != meta.get("size"):
+        return False
+    # only an optimisation: any HEAD failure just means downloading again
+    try:
+        with net_sem or nullcontext(), http_open(url, "HEAD") as r:
+            headers = r.headers
+    except (HTTPException, OSError):
+        _close_connections()
+        return False
+    if headers.get("Content-Length") != str(size):
+        return False
+    etag, modified = headers.get("ETag"), headers.get("Last-Modified")
+    if etag:
+        return etag == meta.get("etag")
+    return bool(modified) and modified == meta.get("last_modified")
 
-def download_with_retry(url: str, out: Path, expected_md5: Optional[str] = None, attempts: int = 5) -> str:
+def download_with_retry(url: str, out: Path, expected_md5: Optional[str] = None, attempts: int = 5,
+                        net_sem: Optional[threading.Semaphore] = None) -> str:
     out.parent.mkdir(parents=True, exist_ok=True)
     for i in range(attempts):
         try:
             if expected_md5 and md5_ok(out, expected_md5):
                 return "cached-ok"
-            with urlopen(url, timeout=120) as r:
-                data = r.read()
+            if not expected_md5 and head_unchanged(url, out, net_sem):
+                return "cached-head-ok"
             tmp = out.with_suffix(out.suffix + ".part")
-            with open(tmp, "wb") as f:
-                f.write(data)
-            tmp.replace(out)
-            if expected_md5 and not md5_ok(out, expected_md5):
+            h = hashlib.md5() if expected_md5 else None
+            # stream to disk, hashing as we go so the file is never re-read;
+            # only the transfer itself holds a network slot
+            with net_sem or nullcontext(), http_open(url) as r, open(tmp, "wb") as f:
+                headers = r.headers
+                read, write = r.read, f.write
+                update = h.update if h is not None else None
+                while chunk := read(4 * 1024 * 1024):
+                    write(chunk)
+                    if update is not None:
+                        update(chunk)
+            if h is not None and h.hexdigest() != expected_md5.lower():
+                tmp.unlink()
                 raise ValueError("md5 mismatch")
+            tmp.replace(out)
+            if h is not None:
+                write_md5_sidecar(out, h.hexdigest())
+            else:
+                write_meta_sidecar(out, headers)
             return "downloaded"
         except Exception:
+            # a half-read response leaves the connection unusable
+            _close_connections()
             if i == attempts - 1:
                 raise
             time.sleep(2 ** i)
     return "failed"
 
-def extract_selected(tar_path: Path, members_to_get: Set[str], outdir: Path, strip_components: int = 1) -> Set[str]:
+def _copy_member(tf: tarfile.TarFile, member: tarfile.TarInfo, src, dst) -> None:
+    if member.size and hasattr(os, "posix_fallocate"):
+        try:
+            os.posix_fallocate(dst.fileno(), 0, member.size)
+        except OSError:
+            pass
+    # uncompressed tar on a real file: copy straight from the archive in
+    # kernel space; compressed streams have to be decoded through Python
+    if hasattr(os, "copy_file_range") and isinstance(tf.fileobj, io.BufferedReader) and not member.issparse():
+        try:
+            offset, left = member.offset_data, member.size
+            while left:
+                n = os.copy_file_range(tf.fileobj.fileno(), dst.fileno(), left, offset_src=offset)
+                if n == 0:
+                    raise OSError("unexpected end of archive")
+                offset += n
+                left -= n
+            return
+        except OSError:
+            dst.seek(0)
+    shutil.copyfileobj(src, dst, 4 * 1024 * 1024)
+
+def output_name(member_name: str) -> str:
+    # outputs are flattened into one directory, named by the member's basename
+    return member_name.rsplit("/", 1)[-1]
+
+def _extract_members(tf: tarfile.TarFile, missing: Set[str], targets: Dict[str, str], outdir: Path) -> bool:
+    # one forward pass, removing names from missing as they are written;
+    # returns True if the end of the archive was reached
+    while missing:
+        member = tf.next()
+        if member is None:
+            return True
+        if not member.isreg() or member.name not in missing:
+            continue
+        src = tf.extractfile(member)
+        if src is None:
+            continue
+        out_path = outdir / targets[member.name]
+        tmp = out_path.with_name(out_path.name + ".part")
+        with open(tmp, "wb") as dst:
+            _copy_member(tf, member, src, dst)
+        tmp.replace(out_path)
+        missing.remove(member.name)
+    return False
+
+def extract_selected(tar_path: Path, members_to_get: Set[str], outdir: Path, xz_threads: int = 0) -> Set[str]:
     outdir.mkdir(parents=True, exist_ok=True)
-    missing = set(members_to_get)
+    targets = {name: output_name(name) for name in members_to_get}
+    # outputs are written to .part files and renamed into place when
+    # complete, so an existing file is treated as done and skipped, along
+    # with the xz decode if nothing is left. Files left by an interrupted run
+    # of older versions, which wrote in place, may be truncated (see README).
+    missing = {name for name, target in targets.items() if not (outdir / target).exists()}
+    if not missing:
+        return missing
+    # xz has no member index, so getmember() would decode the whole stream;
+    # one forward pass that stops after the last wanted member decodes least.
+    # The xz tool, when installed, decodes in its own process with
+    # xz_threads threads (0 = all cores; only multi-block archives use more
+    # than one) while we parse and write members here.
+    xz = shutil.which("xz") if tar_path.suffix.endswith("xz") else None
+    if xz:
+        proc = subprocess.Popen([xz, f"-T{xz_threads}", "-dc", "--", str(tar_path)],
+                                stdout=subprocess.PIPE, stderr=subprocess.PIPE, bufsize=1024 * 1024)
+        tf = None
+        exhausted = False
+        read_error = None
+        try:
+            try:
+                tf = tarfile.open(fileobj=proc.stdout, mode="r|")
+                with tf:
+                    exhausted = _extract_members(tf, missing, targets, outdir)
+            except tarfile.ReadError as e:
+                # may just be xz failing; judged by its exit status below
+                read_error = e
+        finally:
+            finished = exhausted or read_error is not None
+            if finished:
+                # drain trailing padding so xz exits on its own and we can
+                # trust its exit status
+                while proc.stdout.read(1024 * 1024):
+                    pass
+            else:
+                proc.kill()
+            proc.stdout.close()
+            proc.wait()
+            err = proc.stderr.read().decode("utf-8", errors="replace").strip()
+            proc.stderr.close()
+        if not finished or proc.returncode == 0:
+            if read_error is not None:
+                raise read_error
+            return missing
+        if tf is not None and tf.members:
+            raise tarfile.ReadError(f"xz exited with status {proc.returncode} while reading {tar_path}: {err}")
+        # xz failed before producing a single member (e.g. an old xz that
+        # rejects -T); decode with the lzma module instead
+        print(f"Note: xz failed on {tar_path} ({err}), using Python's lzma instead", file=sys.stderr)
     mode = "r:xz" if tar_path.suffix.endswith("xz") else "r:*"
     with tarfile.open(tar_path, mode=mode) as tf:
-        for member in tf:
-            if not member.isreg():
-                continue
-            if member.name in missing:
-                # flatten path after stripping N components
-                parts = Path(member.name).parts[strip_components:]
-                target_name = Path(*parts).name if parts else Path(member.name).name
-                out_path = outdir / target_name
-                src = tf.extractfile(member)
-                if src is None:
-                    continue
-                with open(out_path, "wb") as dst:
-                    for chunk in iter(lambda: src.read(1024 * 1024), b""):
-                        if not chunk:
-                            break
-                        dst.write(chunk)
-                missing.remove(member.name)
-            if not missing:
-                break
+        _extract_members(tf, missing, targets, outdir)
     return missing
 
+def positive_int(value: str) -> int:
+    n = int(value)
+    if n < 1:
+        raise argparse.ArgumentTypeError(f"must be at least 1, got {n}")
+    return n
+
 def main():
     ap = argparse.ArgumentParser(
         description="Fetch ATB file list from OSF, optionally decompress, filter, and download-extract matches."
@@ -83,10 +402,13 @@ def main():
     ap.add_argument("--decompress", action="store_true", help="Also write an uncompressed .tsv next to the metadata.")
     ap.add_argument("--species", help="Case-insensitive regex to match species or genus.")
     ap.add_argument("--save-filtered", help="Path to save filtered TSV (.gz ok).")
+    ap.add_argument("--no-cache", action="store_true", help="Don't read or write cached filter results.")
     ap.add_argument("--preview", type=int, default=5, help="Show first N matches of filtered TSV.")
     # Option B controls
     ap.add_argument("--run-downloads", action="store_true", help="Download tarballs and extract matching FASTA files.")
-    ap.add_argument("--jobs", type=int, default=4, help="Concurrent downloads. Default: 4")
+    ap.add_argument("--jobs", type=int, default=4, help="Concurrent downloads and extractions. Default: 4")
+    ap.add_argument("--net-jobs", type=positive_int,
+                    help="Max tarballs transferring at once; can't exceed --jobs. Default: min(jobs, 4)")
     ap.add_argument("--output-dir", default="assemblies", help="Directory to write extracted FASTA files.")
     ap.add_argument("--delete-tars", action="store_true", help="Delete downloaded tar.xz files after extraction. Default: keep")
     ap.add_argument("--dry-run", action="store_true", help="Show planned downloads/extractions without performing them")
@@ -102,7 +424,7 @@ def main():
         data = infile_path.read_bytes()
         # Header check
         if is_gzip(data):
-            with gzip.GzipFile(fileobj=io.BytesIO(data)) as gz:
+            with _gz.open(io.BytesIO(data)) as gz:
                 header_line = gz.readline().decode("utf-8", errors="replace").strip()
         else:
             header_line = data.split(b"\n", 1)[0].decode("utf-8", errors="replace").strip()
@@ -128,12 +450,21 @@ def main():
             f.write(data)
         print(f"Saved {out_path} ({len(data)} bytes)")
 
+    # Reuse the result of an earlier run with the same metadata and pattern
+    cache_path = filter_cache_path(data, args.species) if args.species and not args.no_cache else None
+    cached = read_filter_cache(cache_path) if cache_path else None
+
+    # Decompress once and share between the TSV copy and the filter
+    raw_tsv = b""
+    if args.decompress or (args.species and not cached):
+        raw_tsv = _gz.decompress(data) if is_gzip(data) else data
+
     # Optional plain TSV copy
     if args.decompress:
         if is_gzip(data):
             tsv_path = out_path.with_suffix("") if out_path.suffix == ".gz" else out_path.with_suffix(".tsv")
-            with gzip.GzipFile(fileobj=io.BytesIO(data)) as gz, open(tsv_path, "wb") as out_tsv:
-                out_tsv.write(gz.read())
+            with open(tsv_path, "wb") as out_tsv:
+                out_tsv.write(raw_tsv)
             print(f"Also wrote uncompressed TSV -> {tsv_path}")
         else:
             print("Note: download does not look gzipped, skipping decompression.", file=sys.stderr)
@@ -143,18 +474,17 @@ def main():
     colmap: Dict[str, int] = {}
     header = ""
     if args.species:
-        if is_gzip(data):
-            with gzip.GzipFile(fileobj=io.BytesIO(data)) as gz:
-                tsv_text = gz.read().decode("utf-8", errors="replace")
+        if cached:
+            header, lines = cached
+            print(f"Using cached filter results from {cache_path}")
         else:
-            tsv_text = data.decode("utf-8", errors="replace")
-
-        lines = tsv_text.splitlines()
-        if not lines:
+            # iterate lines lazily rather than building a list of millions of strings
+            lines = io.TextIOWrapper(io.BytesIO(raw_tsv), encoding="utf-8", errors="replace")
+            header = lines.readline().rstrip("\n")
+        if not header:
             print("Empty file?")
             return
 
-        header = lines[0]
         cols = header.split("\t")
         colmap = {name: i for i, name in enumerate(cols)}
 
@@ -164,34 +494,47 @@ def main():
         if missing:
             print(f"Warning: missing columns: {missing}", file=sys.stderr)
 
-        pattern = re.compile(args.species, flags=re.IGNORECASE)
         preview_left = args.preview
+        species_ix = [colmap[c] for c in ("species_sylph", "species_miniphy") if c in colmap]
+        search = re.compile(args.species, flags=re.IGNORECASE).search
+        # no need to split columns beyond the last species column
+        maxsplit = max(species_ix, default=-1) + 1
+        # only a few thousand distinct species pairs across millions of rows,
+        # so match once per distinct pair and remember the answer
+        seen: Dict[Tuple[str, ...], bool] = {}
 
-        for line in lines[1:]:
-            fields = line.split("\t")
-            vals = []
-            if "species_sylph" in colmap:
-                vals.append(fields[colmap["species_sylph"]])
-            if "species_miniphy" in colmap:
-                vals.append(fields[colmap["species_miniphy"]])
+        save_path = Path(args.save_filtered) if args.save_filtered else None
+        if save_path:
+            save_path.parent.mkdir(parents=True, exist_ok=True)
+        # matching rows are streamed to --save-filtered as they are found
+        with (open_text_out(save_path) if save_path else nullcontext()) as save_f:
+            if save_f:
+                save_f.write(header + "\n")
+            for line in lines:
+                if not cached:
+                    line = line.rstrip("\n")
+                    fields = line.split("\t", maxsplit)
+                    # one memo lookup per row, keyed by both species columns;
+                    # each field is still matched on its own
+                    pair = tuple([fields[ix] for ix in species_ix])
+                    hit = seen.get(pair)
+                    if hit is None:
+                        hit = seen[pair] = any(search(v) for v in pair)
+                    if not hit:
+                        continue
 
-            if any(pattern.search(v or "") for v in vals):
                 kept.append(line)
+                if save_f:
+                    save_f.write(line + "\n")
                 if preview_left > 0:
                     print(line)
                     preview_left -= 1
 
-        print(f"\nMatched {len(kept)} rows")
+        if cache_path and not cached:
+            write_filter_cache(cache_path, header, kept)
 
-        if args.save_filtered:
-            save_path = Path(args.save_filtered)
-            save_path.parent.mkdir(parents=True, exist_ok=True)
-            body = "\n".join([header] + kept) + "\n"
-            if save_path.suffix == ".gz":
-                with gzip.open(save_path, "wt") as f:
-                    f.write(body)
-            else:
-                save_path.write_text(body)
+        print(f"\nMatched {len(kept)} rows")
+        if save_path:
             print(f"Saved filtered metadata to {save_path}")
 
     # Download and extract
@@ -223,7 +566,25 @@ def main():
         tars_dir = outdir / "_tars"
         tars_dir.mkdir(parents=True, exist_ok=True)
 
-        print(f"Planned download of {len(plan)} tarballs with {args.jobs} jobs")
+        # FASTAs already extracted by an earlier run need neither a download
+        # nor an extraction
+        already = 0
+        for key in list(plan):
+            todo = {m for m in plan[key] if not (outdir / output_name(m)).exists()}
+            already += len(plan[key]) - len(todo)
+            if todo:
+                plan[key] = todo
+            else:
+                del plan[key]
+        if already:
+            print(f"Skipping {already} FASTA files already in {outdir}")
+        if not plan:
+            print("All requested FASTA files already extracted.")
+            return
+
+        # transfers run on the --jobs download threads, so that caps it too
+        net_jobs = min(args.net_jobs if args.net_jobs is not None else 4, max(1, args.jobs))
+        print(f"Planned download of {len(plan)} tarballs with {args.jobs} jobs ({net_jobs} transferring at once)")
 
         if args.dry_run:
             print("\n[DRY RUN] Listing planned downloads and members:")
@@ -237,30 +598,45 @@ def main():
             print("\n[DRY RUN] No downloads or extractions performed.")
             return
 
-        # Actually download tarballs
-        with ThreadPoolExecutor(max_workers=max(1, args.jobs)) as ex:
-            futs = {}
-            for (tarname, url), _members in plan.items():
+        # Download tarballs, handing each one to the extraction pool as soon as
+        # it lands so network transfers and xz decoding (CPU-bound, one
+        # process per tarball) overlap
+        net_sem = threading.BoundedSemaphore(net_jobs)
+        # extraction workers start while download threads are running, so
+        # don't fork this multi-threaded process to create them
+        start_method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+        mp_context = multiprocessing.get_context(start_method)
+        # share the cores between concurrent extractions rather than giving
+        # every xz process all of them
+        xz_threads = max(1, (os.cpu_count() or 1) // max(1, args.jobs))
+        misses_total = []
+        with ThreadPoolExecutor(max_workers=max(1, args.jobs)) as dl_ex, \
+                ProcessPoolExecutor(max_workers=max(1, args.jobs), mp_context=mp_context) as ext_ex:
+            dl_futs = {}
+            for (tarname, url), members in plan.items():
                 tar_path = tars_dir / tarname
-                futs[ex.submit(download_with_retry, url, tar_path, md5_map.get(tarname))] = (tarname, tar_path)
-            for fut in as_completed(futs):
-                tarname, tar_path = futs[fut]
+                fut = dl_ex.submit(download_with_retry, url, tar_path, md5_map.get(tarname), net_sem=net_sem)
+                dl_futs[fut] = (tarname, tar_path, members)
+            ext_futs = {}
+            for fut in as_completed(dl_futs):
+                tarname, tar_path, members = dl_futs[fut]
                 status = fut.result()
                 print(f"{tarname}: {status}")
+                ext_futs[ext_ex.submit(extract_selected, tar_path, members, outdir, xz_threads)] = (tarname, tar_path)
 
-        # Extract targets
-        misses_total = []
-        for (tarname, _url), members in plan.items():
-            tar_path = tars_dir / tarname
-            missing = extract_selected(tar_path, members, outdir, strip_components=1)
-            if missing:
-                print(f"Warning: {tarname} missing {len(missing)} expected members", file=sys.stderr)
-                misses_total.extend(list(missing))
-            if args.delete_tars:
-                try:
-                    tar_path.unlink()
-                except Exception:
-                    pass
+            for fut in as_completed(ext_futs):
+                tarname, tar_path = ext_futs[fut]
+                missing = fut.result()
+                if missing:
+                    print(f"Warning: {tarname} missing {len(missing)} expected members", file=sys.stderr)
+                    misses_total.extend(list(missing))
+                if args.delete_tars:
+                    try:
+                        tar_path.unlink()
+                        _md5_sidecar(tar_path).unlink(missing_ok=True)
+                        _meta_sidecar(tar_path).unlink(missing_ok=True)
+                    except Exception:
+                        pass
 
         if misses_total:
             print(f"Finished with {len(misses_total)} missing members. See warnings above.", file=sys.stderr)